@@ -1,46 +1,320 @@
 import sys
-import re
 import os
+import functools
+import itertools
 from PyQt5.QtWidgets import (QTextEdit, QApplication, QMainWindow, QVBoxLayout, QLabel, QSplitter,
                              QWidget, QAction, QHBoxLayout, QCheckBox, QFileDialog, QMessageBox)
 from PyQt5.QtGui import QTextCharFormat, QFont, QSyntaxHighlighter, QIcon, QTextCursor
-from PyQt5.QtCore import Qt, QRegExp
+from PyQt5.QtCore import Qt, QRegularExpression, QTimer, QObject, QThread, pyqtSignal, pyqtSlot
+
+# Leading words recognised by the line classifier
+_ACCESS_MODIFIERS = frozenset(('public', 'private', 'protected'))
+_CONTROL_KEYWORDS = frozenset(('if', 'while', 'for'))
+_METHOD_TYPES = frozenset(('void', 'int', 'String', 'boolean'))
+_VARIABLE_TYPES = frozenset(('int', 'String', 'boolean', 'double', 'float', 'long'))
+_PRINTLN = 'System.out.println'
+
+
+def _strip_comments(s):
+    """Remove // and /* */ comments from a single line and trim it."""
+    start = 0
+    while True:
+        line = s.find('//', start)
+        block = s.find('/*', start)
+        if block < 0 or 0 <= line < block:
+            break
+        end = s.find('*/', block + 2)
+        if end < 0:
+            break
+        s = s[:block] + s[end + 2:]
+        start = block
+    if line >= 0:
+        s = s[:line]
+    return s.strip()
+
+
+def _skip_spaces(s, i):
+    n = len(s)
+    while i < n and s[i].isspace():
+        i += 1
+    return i
+
+
+def _scan_word(s, i):
+    # Returns the identifier-like word starting at i and the index after it
+    n = len(s)
+    j = i
+    while j < n and (s[j].isalnum() or s[j] == '_'):
+        j += 1
+    return s[i:j], j
+
+
+def _ends_block(s, i):
+    # Only an optional opening brace may follow
+    return s[_skip_spaces(s, i):] in ('', '{')
+
+
+def _match_class(s, i):
+    # class <name> [{]
+    j = _skip_spaces(s, i)
+    if j == i:
+        return False
+    name, j = _scan_word(s, j)
+    return bool(name) and _ends_block(s, j)
+
+
+def _match_method(s, i):
+    # <type> <name>(<params>) [{]
+    j = _skip_spaces(s, i)
+    if j == i:
+        return False
+    name, j = _scan_word(s, j)
+    if not name:
+        return False
+    j = _skip_spaces(s, j)
+    if j == len(s) or s[j] != '(':
+        return False
+    close = s.find(')', j + 1)
+    return close >= 0 and _ends_block(s, close + 1)
+
+
+def _match_control(s, i):
+    # if|while|for (<condition>) [{]
+    j = _skip_spaces(s, i)
+    if j == len(s) or s[j] != '(':
+        return False
+    close = s.find(')', j + 1)
+    return close > j + 1 and _ends_block(s, close + 1)
+
+
+def _match_println(s, i):
+    # System.out.println("<text>" | <name>);
+    j = _skip_spaces(s, i)
+    if j == len(s) or s[j] != '(':
+        return False
+    j = _skip_spaces(s, j + 1)
+    if s.startswith('"', j):
+        j = s.find('"', j + 1)
+        if j < 0:
+            return False
+        j += 1
+    else:
+        argument, j = _scan_word(s, j)
+        if not argument:
+            return False
+    return s[_skip_spaces(s, j):] == ');'
+
+
+def _match_value(s, i):
+    # <value>; with no other semicolon in the value
+    value = s[i:-1]
+    return s.endswith(';') and bool(value) and ';' not in value
+
+
+def _match_declaration(s, i):
+    # <type> <name> [= <value>];
+    j = _skip_spaces(s, i)
+    if j == i:
+        return False
+    name, j = _scan_word(s, j)
+    if not name:
+        return False
+    j = _skip_spaces(s, j)
+    if s[j:] == ';':
+        return True
+    return s.startswith('=', j) and _match_value(s, j + 1)
+
+
+def _match_assignment(s, i):
+    # <name> = <value>;
+    j = _skip_spaces(s, i)
+    return s.startswith('=', j) and _match_value(s, j + 1)
+
+
+def _parse_control(s, word, i):
+    # if|while|for (<condition>) [{]
+    return 'control' if _match_control(s, i) else None
+
+
+def _parse_member(s, word, i):
+    # [access] class <name> [{]  |  [access] [static] <type> <name>(<params>) [{]
+    if word in _ACCESS_MODIFIERS:
+        word, i = _scan_word(s, _skip_spaces(s, i))
+    if word == 'class':
+        return 'class' if _match_class(s, i) else None
+    if word == 'static':
+        word, i = _scan_word(s, _skip_spaces(s, i))
+    if word in _METHOD_TYPES and _match_method(s, i):
+        return 'method'
+    return None
+
+
+def _parse_typed(s, word, i):
+    # <type> <name>(<params>) [{]  |  <type> <name> [= <value>];
+    if word in _METHOD_TYPES and _match_method(s, i):
+        return 'method'
+    if word in _VARIABLE_TYPES and _match_declaration(s, i):
+        return 'declaration'
+    return None
+
+
+# Leading word -> the only parser that can accept a line starting with it
+_STATEMENT_PARSERS = {
+    **dict.fromkeys(_CONTROL_KEYWORDS, _parse_control),
+    **dict.fromkeys(_ACCESS_MODIFIERS | {'class', 'static'}, _parse_member),
+    **dict.fromkeys(_METHOD_TYPES | _VARIABLE_TYPES, _parse_typed),
+}
+
+
+def _classify(s):
+    """Classify a stripped, comment-free line in a single left-to-right scan.
+
+    Returns 'class', 'method', 'control', 'print', 'declaration' or
+    'assignment', or None when the line is not a valid statement.
+    """
+    if s.startswith(_PRINTLN):
+        return 'print' if _match_println(s, len(_PRINTLN)) else None
+
+    word, i = _scan_word(s, 0)
+    parse = _STATEMENT_PARSERS.get(word)
+    if parse is not None:
+        kind = parse(s, word, i)
+        if kind is not None:
+            return kind
+
+    # Anything else, keywords included, may still be an assignment
+    if word and not word[0].isdigit() and _match_assignment(s, i):
+        return 'assignment'
+    return None
+
+
+# Format ids, indexing JavaSyntaxHighlighter._formats
+_KEYWORD_FORMAT, _COMMENT_FORMAT = range(2)
+
+_KEYWORDS = (
+    "public", "private", "protected", "class", "interface", "static",
+    "void", "int", "String", "boolean", "double", "float", "long",
+    "if", "else", "while", "for", "return", "new",
+    "System.out.println", "System", "out", "println",
+    "main", "throws", "try", "catch", "final"
+)
+
+_KEYWORD_SET = frozenset(_KEYWORDS)
+
+# Identifier-like words, dotted names included, for keyword lookup. A
+# QRegularExpression rather than re: its offsets are UTF-16 code units, the
+# same units setFormat() and the comment rules below use. Unicode properties
+# keep letters such as "é" inside the word, so "inté" is not read as "int"
+_WORD_RE = QRegularExpression(r'\b[A-Za-z_][\w.]*\b', QRegularExpression.UseUnicodePropertiesOption)
+
+_HIGHLIGHT_RULES = (
+    (QRegularExpression("//[^\n]*"), _COMMENT_FORMAT),  # Single-line comments
+    (QRegularExpression("/\\*.*?\\*/"), _COMMENT_FORMAT)  # Multi-line comments
+)
+
+
+def _utf16_length(text):
+    # Qt positions count UTF-16 code units; astral characters take two
+    return len(text.encode('utf-16-le')) // 2
+
+
+def _scan_keywords(text):
+    spans = []
+    matches = _WORD_RE.globalMatch(text)
+    while matches.hasNext():
+        match = matches.next()
+        word = match.captured()
+        if word in _KEYWORD_SET:
+            spans.append((match.capturedStart(), match.capturedLength(), _KEYWORD_FORMAT))
+        elif '.' in word:
+            # Qualified name: look up each part, e.g. "out" in "foo.out"
+            start = match.capturedStart()
+            for part in word.split('.'):
+                length = _utf16_length(part)
+                if part in _KEYWORD_SET:
+                    spans.append((start, length, _KEYWORD_FORMAT))
+                start += length + 1
+    return spans
+
+
+@functools.lru_cache(maxsize=8192)
+def _plan_formats(text):
+    """Return the (start, length, format_id) spans to apply to one block of text."""
+    spans = _scan_keywords(text)
+    for expression, format_id in _HIGHLIGHT_RULES:
+        matches = expression.globalMatch(text)
+        while matches.hasNext():
+            match = matches.next()
+            spans.append((match.capturedStart(), match.capturedLength(), format_id))
+
+    # Resolve overlaps (later rules win) and merge adjacent spans of one format,
+    # so each run costs a single setFormat call
+    formatAt = [None] * _utf16_length(text)
+    for start, length, format_id in spans:
+        formatAt[start:start + length] = [format_id] * length
+
+    runs = []
+    start = 0
+    for format_id, group in itertools.groupby(formatAt):
+        length = sum(1 for _ in group)
+        if format_id is not None:
+            runs.append((start, length, format_id))
+        start += length
+    return tuple(runs)
+
+
+class Validator(QObject):
+    """Validates lines on a worker thread and reports each line's error and suggestion."""
+    done = pyqtSignal(str, object, object)
+
+    @pyqtSlot(str)
+    def validate(self, text):
+        error_range, correct_option = JavaSyntaxHighlighter._validate_text(text)
+        self.done.emit(text, error_range, correct_option)
 
 
 class JavaSyntaxHighlighter(QSyntaxHighlighter):
+    validationRequested = pyqtSignal(str)
+
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.highlightingRules = []
-        self.current_block_level = 0
-        self.class_parsing_state = False
+
+        # Line text -> (error_range, correct_option) once validated, and
+        # text -> blocks awaiting the worker; keyed by text so a verdict still
+        # applies after lines above it are inserted or removed. runCode reads
+        # the results too
+        self._validationResults = {}
+        self._pendingValidation = {}
+        # Texts not yet sent to the worker; flushed once typing pauses
+        self._queuedValidation = []
+        self._validationTimer = QTimer(self)
+        self._validationTimer.setSingleShot(True)
+        self._validationTimer.setInterval(50)
+        self._validationTimer.timeout.connect(self._flushValidation)
+
+        # Run line validation off the GUI thread
+        self._validatorThread = QThread(self)
+        self._validator = Validator()
+        self._validator.moveToThread(self._validatorThread)
+        self._validatorThread.finished.connect(self._validator.deleteLater)
+        self.validationRequested.connect(self._validator.validate)
+        self._validator.done.connect(self._onValidated)
+        self._validatorThread.start()
+
+        # Stop the worker with the highlighter itself, not only when the IDE closes
+        thread = self._validatorThread
+        self.destroyed.connect(lambda: (thread.quit(), thread.wait()))
 
         # Keyword Formatting
         keywordFormat = QTextCharFormat()
         keywordFormat.setForeground(Qt.blue)
         keywordFormat.setFontWeight(QFont.Bold)
 
-        keywords = [
-            "public", "private", "protected", "class", "interface", "static",
-            "void", "int", "String", "boolean", "double", "float", "long",
-            "if", "else", "while", "for", "return", "new",
-            "System.out.println", "System", "out", "println",
-            "main", "throws", "try", "catch", "final"
-        ]
-
-        self.keywordPatterns = [f"\\b{keyword}\\b" for keyword in keywords]
-
-        for pattern in self.keywordPatterns:
-            rule = (QRegExp(pattern), keywordFormat)
-            self.highlightingRules.append(rule)
-
         # Comment Formatting
         commentFormat = QTextCharFormat()
         commentFormat.setForeground(Qt.green)
-        commentRules = [
-            (QRegExp("//[^\n]*"), commentFormat),  # Single-line comments
-            (QRegExp("/\\*.*\\*/"), commentFormat)  # Multi-line comments
-        ]
-        self.highlightingRules.extend(commentRules)
+
+        self._formats = (keywordFormat, commentFormat)
 
         # Error Formatting
         self.errorFormat = QTextCharFormat()
@@ -49,79 +323,89 @@ class JavaSyntaxHighlighter(QSyntaxHighlighter):
         self.errorFormat.setUnderlineStyle(QTextCharFormat.WaveUnderline)
 
     def highlightBlock(self, text):
-        # Apply syntax highlighting rules
-        for pattern, format in self.highlightingRules:
-            expression = QRegExp(pattern)
-            index = expression.indexIn(text)
-            while index >= 0:
-                length = expression.matchedLength()
-                self.setFormat(index, length, format)
-                index = expression.indexIn(text, index + length)
-
-        # Validate entire text
-        error_range, correct_option = self._validate_text(text)
-        if error_range:
-            self.setFormat(error_range[0], error_range[1] - error_range[0], self.errorFormat)
-
-    def _validate_text(self, text):
+        # Blank lines have nothing to scan or validate
+        if not text or text.isspace():
+            return
+
+        # Spans depend only on the text, so repeated lines share one cached plan
+        setFormat, formats = self.setFormat, self._formats
+        for start, length, format_id in _plan_formats(text):
+            setFormat(start, length, formats[format_id])
+
+        # Apply the worker's verdict for this text, or ask for one
+        result = self._validationResults.get(text)
+        if result is not None:
+            error_range = result[0]
+            if error_range:
+                self.setFormat(error_range[0], error_range[1] - error_range[0], self.errorFormat)
+        else:
+            waiting = self._pendingValidation.get(text)
+            if waiting is None:
+                self._pendingValidation[text] = [self.currentBlock()]
+                self._queuedValidation.append(text)
+                self._validationTimer.start()
+            else:
+                waiting.append(self.currentBlock())
+
+    def _flushValidation(self):
+        # Skip texts that no waiting block holds any more, such as half-typed lines
+        for text in self._queuedValidation:
+            waiting = [block for block in self._pendingValidation[text] if block.text() == text]
+            if waiting:
+                self._pendingValidation[text] = waiting
+                self.validationRequested.emit(text)
+            else:
+                del self._pendingValidation[text]
+        self._queuedValidation.clear()
+
+    def _onValidated(self, text, error_range, correct_option):
+        # Keep the store bounded; the oldest verdicts go first
+        if len(self._validationResults) >= 8192:
+            del self._validationResults[next(iter(self._validationResults))]
+        self._validationResults[text] = (error_range, correct_option)
+
+        # QTextBlock handles follow their lines, so the underline lands on the
+        # blocks that asked even if edits have renumbered them since
+        for block in self._pendingValidation.pop(text, ()):
+            if error_range and block.text() == text:
+                self.rehighlightBlock(block)
+
+    def stopValidator(self):
+        self._validatorThread.quit()
+        self._validatorThread.wait()
+
+    @staticmethod
+    @functools.lru_cache(maxsize=8192)
+    def _validate_text(text):
+        """Return (error_range, correct_option) for one line; pure, and therefore memoized."""
         # Remove comments and trim
-        text_clean = re.sub(r'//.*$|/\*.*\*/', '', text).strip()
-
-        # Ignore empty lines
-        if not text_clean:
-            return None, None
-
-        # Class and Method Patterns
-        class_pattern = r'^(public|private|protected)?\s*class\s+\w+\s*(\{)?$'
-        method_pattern = r'^(public|private|protected)?\s*(static)?\s*(void|int|String|boolean)\s+\w+\s*\([^)]*\)\s*\{?$'
-        main_method_pattern = r'^public\s+static\s+void\s+main\s*\(\s*String\s*\[\]\s*\w+\s*\)\s*\{?$'
-
-        # Control Structure Patterns
-        control_patterns = [
-            r'^(if|while|for)\s*\(\s*[^)]+\s*\)\s*\{?$',
-            r'^(System\.out\.println\s*\(\s*("[^"]*"|\w+)\s*\);)$'
-        ]
-
-        # Variable Declaration Patterns
-        variable_patterns = [
-            r'^(int|String|boolean|double|float|long)\s+\w+\s*(=\s*[^;]+)?;$',
-            r'^[a-zA-Z_]\w*\s*=\s*[^;]+;$'  # Assignment for existing variables
-        ]
-
-        # Handle opening and closing braces
-        if text_clean == '{':
-            self.current_block_level += 1
-            return None, None
-
-        if text_clean == '}':
-            self.current_block_level = max(0, self.current_block_level - 1)
-            return None, None
-
-        # Validate different contexts
-        if re.match(class_pattern, text_clean):
-            self.class_parsing_state = True
-            return None, None
-
-        if re.match(main_method_pattern, text_clean) or re.match(method_pattern, text_clean):
-            return None, None
-
-        # Validate inside control structures and methods
-        if self.current_block_level > 0:
-            if any(re.match(pattern, text_clean) for pattern in control_patterns + variable_patterns):
-                return None, None
-
-        # Additional comprehensive error detection
-        if not any([
-            re.match(class_pattern, text_clean),
-            re.match(method_pattern, text_clean),
-            re.match(main_method_pattern, text_clean),
-            any(re.match(pattern, text_clean) for pattern in control_patterns + variable_patterns)
-        ]):
-            return (0, len(text)), "Expected a valid Java statement"
+        text_clean = _strip_comments(text)
 
+        # Empty lines, lone braces and any recognised statement are accepted
+        if text_clean not in ('', '{', '}') and _classify(text_clean) is None:
+            return (0, _utf16_length(text)), "Expected a valid Java statement"
         return None, None
 
 
+class FileLoader(QThread):
+    """Reads a file on a worker thread so large files do not freeze the window."""
+    loaded = pyqtSignal(str, str)
+    failed = pyqtSignal(str, str)
+
+    def __init__(self, filename, parent=None):
+        super().__init__(parent)
+        self.filename = filename
+
+    def run(self):
+        try:
+            with open(self.filename, 'r') as file:
+                text = file.read()
+        except Exception as e:
+            self.failed.emit(self.filename, str(e))
+        else:
+            self.loaded.emit(self.filename, text)
+
+
 class CodeEditor(QTextEdit):
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -233,6 +517,15 @@ class JavaSyntaxCheckerIDE(QMainWindow):
         runAction = QAction(QIcon('img/run_icon.png'), 'Run', self)
         debugToolbar.addAction(runAction)
 
+        # Coalesce repeated Run requests into a single full-file check
+        self.runTimer = QTimer(self)
+        self.runTimer.setSingleShot(True)
+        self.runTimer.setInterval(150)
+        self.runTimer.timeout.connect(self.runCode)
+
+        # The FileLoader whose text the editor is waiting for, if any
+        self.fileLoader = None
+
         # Create status bar
         self.statusBar().showMessage('Ready')
 
@@ -256,7 +549,13 @@ class JavaSyntaxCheckerIDE(QMainWindow):
         cutAction.triggered.connect(self.textEdit.cut)
         copyAction.triggered.connect(self.textEdit.copy)
         pasteAction.triggered.connect(self.textEdit.paste)
-        runAction.triggered.connect(self.runCode)
+        runAction.triggered.connect(lambda: self.runTimer.start())
+
+    def closeEvent(self, event):
+        for loader in self.findChildren(FileLoader):
+            loader.wait()
+        self.highlighter.stopValidator()
+        super().closeEvent(event)
 
     def newFile(self):
         # Check if current file has unsaved changes
@@ -269,6 +568,10 @@ class JavaSyntaxCheckerIDE(QMainWindow):
             elif reply == QMessageBox.Yes:
                 self.saveFile()
 
+        # A new file supersedes any Open still loading
+        self.fileLoader = None
+        self.textEdit.setReadOnly(False)
+
         self.textEdit.clear()
         self.errorDisplay.clear()
         self.textEdit.current_file_path = None
@@ -280,13 +583,42 @@ class JavaSyntaxCheckerIDE(QMainWindow):
                                                   os.path.expanduser('~'),
                                                   'Java Files (*.java);;All Files (*)')
         if filename:
-            try:
-                with open(filename, 'r') as file:
-                    self.textEdit.setPlainText(file.read())
-                    self.textEdit.current_file_path = filename
-                    self.statusBar().showMessage(f'Opened: {filename}')
-            except Exception as e:
-                QMessageBox.critical(self, 'Error', f'Could not open file: {str(e)}')
+            # Read off the GUI thread; the editor is filled in once the text arrives
+            loader = FileLoader(filename, self)
+            loader.loaded.connect(self.onFileLoaded)
+            loader.failed.connect(self.onFileLoadFailed)
+            loader.finished.connect(loader.deleteLater)
+            self.statusBar().showMessage(f'Opening: {filename}')
+
+            # Only the latest Open may fill the editor, which is read-only until then
+            self.fileLoader = loader
+            self.textEdit.setReadOnly(True)
+            loader.start()
+
+    def onFileLoaded(self, filename, text):
+        if self.sender() is not self.fileLoader:
+            return
+        self.fileLoader = None
+        self.textEdit.setReadOnly(False)
+
+        # Detach the highlighter while the text goes in so it runs once over
+        # the whole document instead of once per inserted block
+        document = self.textEdit.document()
+        self.highlighter.setDocument(None)
+        self.textEdit.setPlainText(text)
+        self.highlighter.setDocument(document)
+
+        self.textEdit.current_file_path = filename
+        self.statusBar().showMessage(f'Opened: {filename}')
+
+    def onFileLoadFailed(self, filename, error):
+        if self.sender() is not self.fileLoader:
+            return
+        self.fileLoader = None
+        self.textEdit.setReadOnly(False)
+
+        self.statusBar().showMessage('Ready')
+        QMessageBox.critical(self, 'Error', f'Could not open file: {error}')
 
     def saveFile(self):
         # If no previous file path, call save as
@@ -294,8 +626,7 @@ class JavaSyntaxCheckerIDE(QMainWindow):
             return self.saveFileAs()
 
         try:
-            with open(self.textEdit.current_file_path, 'w') as file:
-                file.write(self.textEdit.toPlainText())
+            self.writeDocument(self.textEdit.current_file_path)
             self.textEdit.document().setModified(False)
             self.statusBar().showMessage(f'Saved: {self.textEdit.current_file_path}')
             return True
@@ -303,6 +634,19 @@ class JavaSyntaxCheckerIDE(QMainWindow):
             QMessageBox.critical(self, 'Error', f'Could not save file: {str(e)}')
             return False
 
+    def writeDocument(self, filename):
+        # Stream block by block instead of copying the whole document first;
+        # Python file I/O keeps the same encoding that FileLoader reads with
+        with open(filename, 'w') as file:
+            block = self.textEdit.document().begin()
+            while block.isValid():
+                # Same conversions as toPlainText(): line separators and
+                # non-breaking spaces become plain characters
+                file.write(block.text().replace('\u2028', '\n').replace('\u00a0', ' '))
+                block = block.next()
+                if block.isValid():
+                    file.write('\n')
+
     def saveFileAs(self):
         filename, _ = QFileDialog.getSaveFileName(self, 'Save File',
                                                   os.path.expanduser('~'),
@@ -313,8 +657,7 @@ class JavaSyntaxCheckerIDE(QMainWindow):
                 if not filename.endswith('.java'):
                     filename += '.java'
 
-                with open(filename, 'w') as file:
-                    file.write(self.textEdit.toPlainText())
+                self.writeDocument(filename)
 
                 self.textEdit.current_file_path = filename
                 self.textEdit.document().setModified(False)
@@ -327,17 +670,25 @@ class JavaSyntaxCheckerIDE(QMainWindow):
 
     def runCode(self):
         self.errorDisplay.clear()
-        text = self.textEdit.toPlainText()
-        lines = text.split('\n')
         error_count = 0
-
-        for i, line in enumerate(lines):
-            error_range, correct_option = self.highlighter._validate_text(line)
+        results = self.highlighter._validationResults
+
+        # Walk the document's blocks instead of copying and splitting its text
+        block = self.textEdit.document().begin()
+        while block.isValid():
+            line = block.text()
+            # Reuse the highlighter's verdict when it was made for this exact text
+            result = results.get(line)
+            if result is not None:
+                error_range, correct_option = result
+            else:
+                error_range, correct_option = self.highlighter._validate_text(line)
             if error_range:
                 error_count += 1
-                self.errorDisplay.append(f'Error {error_count} on line {i + 1}: {line}')
+                self.errorDisplay.append(f'Error {error_count} on line {block.blockNumber() + 1}: {line}')
                 if correct_option:
                     self.errorDisplay.append(f'Suggestion: {correct_option}\n')
+            block = block.next()
 
         if error_count == 0:
             self.errorDisplay.append('No syntax errors detected. Code looks good!')